@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
-from .routes import contacts
+from fastapi.routing import APIRoute
+from .routes import contacts, jobs
 import datetime
 
 app = FastAPI(
@@ -16,7 +17,10 @@ Esta API permite gerenciar uma agenda de contatos com as seguintes funcionalidad
 - **Buscar contatos** por nome (busca parcial)
 - **Atualizar e deletar** contatos existentes
 - **Visualizar estatísticas** da agenda
-- **Exportar dados** em formato JSON
+- **Exportar dados** em formato JSON ou snapshot binário
+- **Detectar duplicados** por telefone e nome parecido
+- **Alterações em lote** e feed de mudanças
+- **Operações pesadas** (importação, exportação, duplicados) em segundo plano
 
 ### Tipos de telefone suportados:
 - `mobile` - Celular
@@ -47,6 +51,7 @@ A API valida automaticamente números de telefone brasileiros e aceita formatos
     },
 )
 
+app.include_router(jobs.router)
 app.include_router(contacts.router)
 
 @app.get("/", response_class=HTMLResponse)
@@ -264,7 +269,14 @@ async def health_check():
             "Busca por Nome",
             "Estatísticas",
             "Sistema de Backup",
-            "Validação Brasileira"
+            "Snapshot Binário",
+            "Validação Brasileira",
+            "Busca em Lote",
+            "Alterações em Lote",
+            "Consulta com Filtros",
+            "Feed de Alterações",
+            "Detecção de Duplicados",
+            "Jobs em Segundo Plano"
         ]
     }
 
@@ -292,8 +304,9 @@ async def api_info():
             "containerization": "Docker + Docker Compose"
         },
         "endpoints": {
-            "total": 9,
-            "categories": ["CRUD", "Search", "Stats", "Backup", "Health"]
+            "total": sum(isinstance(route, APIRoute) for route in app.routes),
+            "categories": ["CRUD", "Search", "Query", "Stats", "Backup", "Bulk",
+                           "Changes", "Duplicates", "Jobs", "Health"]
         },
         "last_updated": datetime.datetime.now().isoformat()
     } 
\ No newline at end of file
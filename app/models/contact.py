@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from pydantic import BaseModel, Field, validator, root_validator
+from typing import List, Optional, Literal
 from .enums import PhoneType, ContactCategory
 import re
 
@@ -95,4 +95,56 @@ class ContactStats(BaseModel):
     por_categoria: dict = Field(..., description="Quantidade por categoria")
     tipos_telefone: dict = Field(..., description="Quantidade por tipo de telefone")
     contatos_multiplos_telefones: int = Field(..., description="Contatos com múltiplos telefones")
-    ultima_atualizacao: str = Field(..., description="Timestamp da última atualização") 
\ No newline at end of file
+    ultima_atualizacao: str = Field(..., description="Timestamp da última atualização")
+
+class ContactBatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., min_items=1, max_items=1000, description="Lista de IDs de contatos (máximo 1000)")
+
+class ContactBatchGetResponse(BaseModel):
+    contacts: List[Contact] = Field(..., description="Contatos encontrados, na ordem dos IDs solicitados")
+    missing_ids: List[int] = Field(..., description="IDs solicitados que não foram encontrados")
+
+class ContactRestoreItem(ContactCreate):
+    id: int = Field(..., ge=1, le=4294967295, description="ID do contato no backup")
+
+class ContactBackup(BaseModel):
+    backup_type: Literal["full", "incremental"] = Field("full", description="Tipo do backup (full ou incremental)")
+    backup_token: str = Field(..., description="Token do backup, usado como base para o próximo backup incremental")
+    base_token: Optional[str] = Field(None, description="Token do backup sobre o qual este incremental se aplica")
+    contacts: List[ContactRestoreItem] = Field(..., description="Contatos completos (full) ou alterados (incremental)")
+    deleted_ids: List[int] = Field([], description="IDs removidos desde o backup base (apenas incremental)")
+
+class ContactFilter(BaseModel):
+    name: Optional[str] = Field(None, min_length=2, description="Nome ou parte do nome")
+    category: Optional[ContactCategory] = Field(None, description="Categoria do contato")
+    phone_type: Optional[PhoneType] = Field(None, description="Possui ao menos um telefone deste tipo")
+    min_phones: Optional[int] = Field(None, ge=1, le=5, description="Quantidade mínima de telefones")
+    max_phones: Optional[int] = Field(None, ge=1, le=5, description="Quantidade máxima de telefones")
+
+    @root_validator(skip_on_failure=True)
+    def validate_criteria(cls, values):
+        if all(v is None for v in values.values()):
+            raise ValueError('Informe ao menos um critério de filtro')
+        min_phones, max_phones = values.get('min_phones'), values.get('max_phones')
+        if min_phones is not None and max_phones is not None and min_phones > max_phones:
+            raise ValueError('min_phones não pode ser maior que max_phones')
+        return values
+
+class ContactBulkSelection(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_items=1, description="IDs dos contatos afetados")
+    filter: Optional[ContactFilter] = Field(None, description="Critérios para selecionar os contatos afetados")
+
+    @root_validator(skip_on_failure=True)
+    def validate_selector(cls, values):
+        if (values.get('ids') is None) == (values.get('filter') is None):
+            raise ValueError('Informe exatamente um entre "ids" e "filter"')
+        return values
+
+class ContactBulkUpdateRequest(ContactBulkSelection):
+    update: ContactUpdate = Field(..., description="Alterações aplicadas a todos os contatos selecionados")
+
+    @validator('update')
+    def validate_update(cls, v):
+        if not v.dict(exclude_unset=True):
+            raise ValueError('Informe ao menos um campo para atualizar')
+        return v
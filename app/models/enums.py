@@ -8,4 +8,16 @@ class PhoneType(str, Enum):
 class ContactCategory(str, Enum):
     FAMILY = "familiar"
     PERSONAL = "pessoal"
-    COMMERCIAL = "comercial" 
\ No newline at end of file
+    COMMERCIAL = "comercial"
+
+class JobType(str, Enum):
+    EXPORT = "exportacao"
+    IMPORT = "importacao"
+    STATISTICS = "estatisticas"
+    DUPLICATES = "duplicados"
+
+class JobStatus(str, Enum):
+    PENDING = "pendente"
+    RUNNING = "executando"
+    COMPLETED = "concluido"
+    FAILED = "falhou"
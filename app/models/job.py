@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from .enums import JobType, JobStatus
+
+class Job(BaseModel):
+    id: str = Field(..., description="ID único do job")
+    type: JobType = Field(..., description="Tipo do job")
+    status: JobStatus = Field(JobStatus.PENDING, description="Situação atual do job")
+    progress: float = Field(0.0, description="Progresso de 0.0 a 1.0")
+    processed: int = Field(0, description="Itens processados")
+    total: Optional[int] = Field(None, description="Total de itens a processar, quando conhecido")
+    created_at: str = Field(..., description="Timestamp de criação")
+    started_at: Optional[str] = Field(None, description="Timestamp de início da execução")
+    finished_at: Optional[str] = Field(None, description="Timestamp de término")
+    error: Optional[str] = Field(None, description="Mensagem de erro, se o job falhou")
+    result_url: Optional[str] = Field(None, description="URL para baixar o resultado, quando concluído")
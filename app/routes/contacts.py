@@ -1,11 +1,46 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
-from ..models.contact import Contact, ContactCreate, ContactUpdate, ContactStats
-from ..models.enums import ContactCategory
+import json
+import sys
+from urllib.parse import quote
+from pydantic import ValidationError
+from ..models.contact import (
+    Contact, ContactCreate, ContactUpdate, ContactStats,
+    ContactBatchGetRequest, ContactBatchGetResponse, ContactBackup,
+    ContactBulkSelection, ContactBulkUpdateRequest
+)
+from ..models.enums import ContactCategory, PhoneType
 from ..services.contact_service import contact_service
+from ..services.contact_index import NameKey, fold_name
+from ..services.snapshot import SNAPSHOT_MEDIA_TYPE, SnapshotError
+from ..services.duplicate_detector import DEFAULT_NAME_SIMILARITY
+from .fields import FIELDS_DESCRIPTION, parse_fields
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+def _resync_detail(since: int) -> dict:
+    return {
+        "message": f"Sequência {since} não está mais disponível no histórico de alterações. Faça um backup completo.",
+        "snapshot_url": "/contacts/backup",
+        "latest_sequence": contact_service.get_latest_sequence()
+    }
+
+def _parse_name_cursor(after: Optional[str], descending: bool) -> Optional[NameKey]:
+    if after is None:
+        return None
+    name, separator, contact_id = after.rpartition("|")
+    if separator and contact_id.isdigit():
+        return fold_name(name), int(contact_id)
+    # Sem ID, o cursor pula todos os contatos com esse nome.
+    return fold_name(after), (0 if descending else sys.maxsize)
+
+def _contacts_response(contacts: List[Contact], fields: Optional[List[str]]):
+    if fields is None:
+        return contacts
+    return JSONResponse(content=contact_service.serialize_contacts(contacts, fields))
+
 @router.post("/", response_model=Contact, status_code=201)
 async def create_contact(contact: ContactCreate):
     return contact_service.create_contact(contact)
@@ -16,28 +51,247 @@ async def get_statistics():
 
 @router.get("/search", response_model=List[Contact])
 async def search_contacts(
-    name: str = Query(..., min_length=2, description="Nome ou parte do nome para buscar")
+    name: str = Query(..., min_length=2, description="Nome ou parte do nome para buscar"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
+    selected_fields = parse_fields(fields)
     contacts = contact_service.search_contacts_by_name(name)
     if not contacts:
         raise HTTPException(status_code=404, detail=f"Nenhum contato encontrado com o nome '{name}'")
-    return contacts
+    return _contacts_response(contacts, selected_fields)
+
+@router.get("/search/cache", response_model=dict)
+async def get_search_cache_stats():
+    return contact_service.get_search_cache_stats()
+
+@router.get("/duplicates", response_model=dict)
+async def find_duplicates(
+    threshold: float = Query(DEFAULT_NAME_SIMILARITY, ge=0.5, le=1.0, description="Similaridade mínima entre nomes")
+):
+    # A detecção roda numa thread para não travar o event loop; o snapshot é
+    # tirado antes, no próprio loop, onde acontecem as escritas.
+    snapshot = contact_service.snapshot()
+    return await run_in_threadpool(contact_service.find_duplicates, threshold, snapshot)
+
+@router.get("/query", response_model=dict)
+async def query_contacts(
+    name: Optional[str] = Query(None, min_length=2, description="Nome ou parte do nome"),
+    category: Optional[ContactCategory] = Query(None, description="Categoria do contato"),
+    phone_type: Optional[PhoneType] = Query(None, description="Possui ao menos um telefone deste tipo"),
+    min_phones: Optional[int] = Query(None, ge=1, le=5, description="Quantidade mínima de telefones"),
+    max_phones: Optional[int] = Query(None, ge=1, le=5, description="Quantidade máxima de telefones"),
+    sort: str = Query("id", pattern="^-?(id|name)$", description="Ordenação: id, -id, name ou -name"),
+    limit: int = Query(100, ge=1, le=1000, description="Quantidade máxima de contatos retornados"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    selected_fields = parse_fields(fields)
+    if min_phones is not None and max_phones is not None and min_phones > max_phones:
+        raise HTTPException(status_code=400, detail="min_phones não pode ser maior que max_phones")
+    
+    contacts, total, plan = contact_service.query_contacts(
+        name=name,
+        category=category.value if category else None,
+        phone_type=phone_type.value if phone_type else None,
+        min_phones=min_phones,
+        max_phones=max_phones,
+        sort=sort,
+        limit=limit
+    )
+    return {
+        "total": total,
+        "returned": len(contacts),
+        "plan": plan,
+        "contacts": contact_service.serialize_contacts(contacts, selected_fields)
+    }
 
 @router.get("/backup", response_model=dict)
-async def backup_contacts():
-    return contact_service.export_contacts()
+async def backup_contacts(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    since_token: Optional[str] = Query(None, description="Token de um backup anterior para gerar backup incremental"),
+    format: str = Query("json", pattern="^(json|binary)$", description="Formato do backup: json ou binary (snapshot compacto)")
+):
+    selected_fields = parse_fields(fields)
+    if format == "binary":
+        if selected_fields is not None or since_token is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="O formato binary só gera backups completos (sem fields e since_token)"
+            )
+        try:
+            content, backup_token = contact_service.export_snapshot()
+        except SnapshotError as e:
+            raise HTTPException(status_code=500, detail=f"Não foi possível gerar o snapshot: {e}")
+        return Response(
+            content=content,
+            media_type=SNAPSHOT_MEDIA_TYPE,
+            headers={
+                "Content-Disposition": f'attachment; filename="contacts-{backup_token}.ctsnap"',
+                "X-Backup-Token": backup_token
+            }
+        )
+    
+    if since_token is None:
+        return contact_service.export_contacts(selected_fields)
+    
+    backup = contact_service.export_incremental(since_token, selected_fields)
+    if backup is None:
+        raise HTTPException(
+            status_code=410,
+            detail=f"Token de backup '{since_token}' inválido ou expirado. Gere um backup completo."
+        )
+    return backup
+
+@router.post("/restore", response_model=dict)
+async def restore_contacts(backup: ContactBackup):
+    result = contact_service.restore_backup(backup)
+    if result is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Backup incremental não se aplica ao estado atual (base '{backup.base_token}'). Restaure o backup base primeiro."
+        )
+    return result
+
+@router.post(
+    "/restore/binary",
+    response_model=dict,
+    openapi_extra={"requestBody": {"required": True, "content": {SNAPSHOT_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}}}
+)
+async def restore_contacts_binary(
+    request: Request,
+    x_backup_token: Optional[str] = Header(None, description="Token do backup (cabeçalho X-Backup-Token do download)")
+):
+    """
+    Restaurar um snapshot binário gerado por `/contacts/backup?format=binary`.
+    
+    O snapshot é sempre completo: contatos ausentes dele são removidos.
+    """
+    payload = await request.body()
+    try:
+        backup = await run_in_threadpool(contact_service.parse_snapshot_backup, payload, x_backup_token)
+    except SnapshotError as e:
+        raise HTTPException(status_code=400, detail=f"Snapshot inválido: {e}")
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Snapshot com contatos inválidos: {e}")
+    return contact_service.restore_backup(backup)
+
+@router.get("/changes")
+async def get_changes(
+    since: int = Query(0, ge=0, description="Última sequência já aplicada pelo cliente"),
+    limit: int = Query(100, ge=1, le=1000, description="Quantidade máxima de alterações retornadas"),
+    timeout: float = Query(0, ge=0, le=60, description="Segundos para aguardar novas alterações (long-poll)")
+):
+    changes = contact_service.get_changes(since, limit)
+    if changes == [] and timeout > 0:
+        await contact_service.wait_for_changes(since, timeout)
+        changes = contact_service.get_changes(since, limit)
+    if changes is None:
+        raise HTTPException(status_code=410, detail=_resync_detail(since))
+    
+    latest_sequence = contact_service.get_latest_sequence()
+    next_since = changes[-1]["sequence"] if changes else since
+    return {
+        "changes": changes,
+        "next_since": next_since,
+        "latest_sequence": latest_sequence,
+        "has_more": next_since < latest_sequence
+    }
+
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Última sequência já aplicada (padrão: sequência atual)"),
+    last_event_id: Optional[int] = Header(None, description="Reconexão automática do EventSource")
+):
+    if last_event_id is not None:
+        since = last_event_id
+    elif since is None:
+        since = contact_service.get_latest_sequence()
+    
+    async def event_stream():
+        cursor = since
+        while not await request.is_disconnected():
+            changes = contact_service.get_changes(cursor)
+            if changes is None:
+                yield f"event: reset\ndata: {json.dumps(_resync_detail(cursor), ensure_ascii=False)}\n\n"
+                return
+            for change in changes:
+                cursor = change["sequence"]
+                yield f"id: {cursor}\nevent: {change['type']}\ndata: {json.dumps(change, ensure_ascii=False)}\n\n"
+            if not await contact_service.wait_for_changes(cursor, 15):
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@router.post("/batch-get", response_model=ContactBatchGetResponse)
+async def batch_get_contacts(request: ContactBatchGetRequest):
+    contacts, missing_ids = contact_service.get_contacts_by_ids(request.ids)
+    return {"contacts": contacts, "missing_ids": missing_ids}
+
+def _raise_bulk_missing(missing_ids: List[int]):
+    raise HTTPException(
+        status_code=404,
+        detail=f"Contatos não encontrados: {', '.join(map(str, missing_ids))}. Nenhuma alteração foi aplicada."
+    )
+
+@router.patch("/bulk", response_model=dict)
+async def bulk_update_contacts(request: ContactBulkUpdateRequest):
+    updated, missing_ids = contact_service.bulk_update_contacts(request, request.update)
+    if missing_ids:
+        _raise_bulk_missing(missing_ids)
+    return {"updated": len(updated), "contact_ids": [contact.id for contact in updated]}
+
+@router.delete("/bulk", response_model=dict)
+async def bulk_delete_contacts(request: ContactBulkSelection):
+    deleted_ids, missing_ids = contact_service.bulk_delete_contacts(request)
+    if missing_ids:
+        _raise_bulk_missing(missing_ids)
+    return {"deleted": len(deleted_ids), "contact_ids": deleted_ids}
 
 @router.get("/{contact_id}", response_model=Contact)
-async def get_contact(contact_id: int):
+async def get_contact(
+    contact_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    selected_fields = parse_fields(fields)
     contact = contact_service.get_contact(contact_id)
     if not contact:
         raise HTTPException(status_code=404, detail=f"Contato com ID {contact_id} não encontrado")
+    if selected_fields is not None:
+        return JSONResponse(content=contact_service.serialize_contact(contact, selected_fields))
     return contact
 
 @router.get("/", response_model=List[Contact])
 async def get_contacts(
-    category: Optional[ContactCategory] = Query(None, description="Filtrar por categoria específica")
+    response: Response,
+    category: Optional[ContactCategory] = Query(None, description="Filtrar por categoria específica"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    sort: Optional[str] = Query(None, pattern="^-?name$", description="Ordenar por nome: name ou -name"),
+    after: Optional[str] = Query(None, description="Cursor (X-Next-Cursor) ou nome a partir do qual continuar; exige sort"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Tamanho da página; exige sort")
 ):
+    selected_fields = parse_fields(fields)
+    if sort is None and (after is not None or limit is not None):
+        raise HTTPException(status_code=400, detail="Os parâmetros after e limit exigem sort=name ou sort=-name")
+    
+    if sort is not None:
+        descending = sort.startswith("-")
+        contacts, next_key = contact_service.list_contacts_by_name(
+            descending=descending,
+            after=_parse_name_cursor(after, descending),
+            limit=limit,
+            category=category.value if category else None
+        )
+        if category and not contacts and after is None:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Nenhum contato encontrado na categoria '{category.value}'"
+            )
+        result = _contacts_response(contacts, selected_fields)
+        if next_key is not None:
+            cursor = quote(f"{next_key[0]}|{next_key[1]}", safe="")
+            (result if isinstance(result, Response) else response).headers["X-Next-Cursor"] = cursor
+        return result
+    
     if category:
         contacts = contact_service.get_contacts_by_category(category.value)
         if not contacts:
@@ -45,8 +299,8 @@ async def get_contacts(
                 status_code=404, 
                 detail=f"Nenhum contato encontrado na categoria '{category.value}'"
             )
-        return contacts
-    return contact_service.get_all_contacts()
+        return _contacts_response(contacts, selected_fields)
+    return _contacts_response(contact_service.get_all_contacts(), selected_fields)
 
 @router.put("/{contact_id}", response_model=Contact)
 async def update_contact(contact_id: int, contact_update: ContactUpdate):
@@ -0,0 +1,17 @@
+from fastapi import HTTPException
+from typing import List, Optional
+from ..services.contact_service import CONTACT_FIELDS
+
+FIELDS_DESCRIPTION = f"Campos a retornar, separados por vírgula ({', '.join(CONTACT_FIELDS)})"
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    invalid = [f for f in requested if f not in CONTACT_FIELDS]
+    if not requested or invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos: {', '.join(invalid) or fields}. Campos disponíveis: {', '.join(CONTACT_FIELDS)}"
+        )
+    return requested
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
+from ..models.job import Job
+from ..models.enums import JobStatus
+from ..services.job_service import job_service
+from ..services.duplicate_detector import DEFAULT_NAME_SIMILARITY
+from .fields import FIELDS_DESCRIPTION, parse_fields
+
+router = APIRouter(prefix="/contacts/jobs", tags=["jobs"])
+
+@router.post("/export", response_model=Job, status_code=202)
+async def submit_export_job(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    return job_service.submit_export(parse_fields(fields))
+
+IMPORT_BODY_SCHEMA = {
+    "type": "object",
+    "required": ["contacts"],
+    "properties": {
+        "contacts": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"$ref": "#/components/schemas/ContactCreate"}
+        }
+    }
+}
+
+@router.post(
+    "/import",
+    response_model=Job,
+    status_code=202,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": IMPORT_BODY_SCHEMA}}}}
+)
+async def submit_import_job(request: Request):
+    """
+    Importar contatos em segundo plano.
+    
+    Corpo: `{"contacts": [{"name": ..., "phones": [...], "category": ...}, ...]}`.
+    O formato do corpo é conferido antes de aceitar o job; a validação de cada
+    contato é feita pelo próprio job, fora do event loop.
+    """
+    try:
+        return job_service.submit_import(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/statistics", response_model=Job, status_code=202)
+async def submit_statistics_job():
+    return job_service.submit_statistics()
+
+@router.post("/duplicates", response_model=Job, status_code=202)
+async def submit_duplicates_job(
+    threshold: float = Query(DEFAULT_NAME_SIMILARITY, ge=0.5, le=1.0, description="Similaridade mínima entre nomes")
+):
+    return job_service.submit_duplicates(threshold)
+
+@router.get("/", response_model=List[Job])
+async def get_jobs():
+    return job_service.get_all_jobs()
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job com ID {job_id} não encontrado")
+    return job
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job com ID {job_id} não encontrado")
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job_id} ainda não foi concluído (status: {job.status.value})"
+        )
+    content = job_service.get_result(job_id)
+    if content is None:
+        raise HTTPException(
+            status_code=410,
+            detail=f"Resultado do job {job_id} expirou ou foi descartado. Execute o job novamente."
+        )
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{job.type.value}-{job_id}.json"'}
+    )
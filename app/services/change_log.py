@@ -0,0 +1,77 @@
+from typing import List, Optional, Dict, Deque, Tuple
+from collections import deque
+from datetime import datetime
+import asyncio
+import threading
+
+CHANGE_LOG_MAX_EVENTS = 1000
+
+class ChangeLog:
+    def __init__(self, max_events: int = CHANGE_LOG_MAX_EVENTS):
+        self._events: Deque[Dict] = deque(maxlen=max_events)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def latest_sequence(self) -> int:
+        return self._sequence
+
+    def record(self, event_type: str, contact_id: int, contact: Optional[Dict] = None) -> int:
+        return self.record_many([(event_type, contact_id, contact)])[0]
+
+    def record_many(self, events: List[Tuple[str, int, Optional[Dict]]]) -> List[int]:
+        timestamp = datetime.now().isoformat()
+        sequences = []
+        with self._lock:
+            for event_type, contact_id, contact in events:
+                self._sequence += 1
+                self._events.append({
+                    "sequence": self._sequence,
+                    "type": event_type,
+                    "contact_id": contact_id,
+                    "contact": contact,
+                    "timestamp": timestamp
+                })
+                sequences.append(self._sequence)
+            waiters, self._waiters = self._waiters, []
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        return sequences
+
+    def get_since(self, since: int, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        with self._lock:
+            if since > self._sequence:
+                return None
+            if since == self._sequence:
+                return []
+            oldest = self._events[0]["sequence"] if self._events else self._sequence + 1
+            if since < oldest - 1:
+                return None
+
+            start = since - oldest + 1
+            end = len(self._events) if limit is None else min(len(self._events), start + limit)
+            return [self._events[i] for i in range(start, end)]
+
+    async def wait_for_change(self, since: int, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._sequence != since:
+                return True
+            self._waiters.append((loop, future))
+
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
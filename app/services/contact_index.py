@@ -0,0 +1,262 @@
+from typing import List, Optional, Dict, Set, Tuple, Callable, Iterator
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from ..models.contact import Contact
+from ..models.enums import ContactCategory, PhoneType
+
+NAME_INDEX_BUCKET_SIZE = 512
+
+NameKey = Tuple[str, int]
+
+def fold_name(name: str) -> str:
+    return name.lower().strip()
+
+def name_trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SortedNameIndex:
+    # Lista ordenada de (nome normalizado, id) dividida em blocos: a busca do
+    # bloco é binária e cada inserção/remoção só desloca um bloco pequeno.
+    def __init__(self, bucket_size: int = NAME_INDEX_BUCKET_SIZE):
+        self._buckets: List[List[NameKey]] = []
+        self._maxes: List[NameKey] = []
+        self._bucket_size = bucket_size
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets)
+
+    def load_sorted(self, keys: List[NameKey]):
+        size = self._bucket_size
+        self._buckets = [keys[i:i + size] for i in range(0, len(keys), size)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+
+    def add(self, key: NameKey):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            return
+
+        position = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[position]
+        insort(bucket, key)
+        self._maxes[position] = bucket[-1]
+        if len(bucket) > 2 * self._bucket_size:
+            half = bucket[self._bucket_size:]
+            del bucket[self._bucket_size:]
+            self._buckets.insert(position + 1, half)
+            self._maxes[position] = bucket[-1]
+            self._maxes.insert(position + 1, half[-1])
+
+    def remove(self, key: NameKey):
+        position = bisect_left(self._maxes, key)
+        if position == len(self._buckets):
+            return
+        bucket = self._buckets[position]
+        index = bisect_left(bucket, key)
+        if index == len(bucket) or bucket[index] != key:
+            return
+        del bucket[index]
+        if bucket:
+            self._maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del self._maxes[position]
+
+    def iter_after(self, key: Optional[NameKey] = None) -> Iterator[NameKey]:
+        if key is None:
+            position, index = 0, 0
+        else:
+            position = bisect_right(self._maxes, key)
+            if position == len(self._buckets):
+                return
+            index = bisect_right(self._buckets[position], key)
+        for bucket_position in range(position, len(self._buckets)):
+            bucket = self._buckets[bucket_position]
+            yield from bucket[index:] if index else bucket
+            index = 0
+
+    def iter_before(self, key: Optional[NameKey] = None) -> Iterator[NameKey]:
+        if key is None:
+            position = len(self._buckets) - 1
+            index = len(self._buckets[position]) if self._buckets else 0
+        else:
+            position = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+            if position < 0:
+                return
+            index = bisect_left(self._buckets[position], key)
+        for bucket_position in range(position, -1, -1):
+            bucket = self._buckets[bucket_position]
+            end = index if bucket_position == position else len(bucket)
+            for i in range(end - 1, -1, -1):
+                yield bucket[i]
+
+class ContactIndex:
+    def __init__(self):
+        self.by_category: Dict[str, Set[int]] = {}
+        self.by_phone_type: Dict[str, Set[int]] = {}
+        self.by_phone_count: Dict[int, Set[int]] = {}
+        self.by_trigram: Dict[str, Set[int]] = {}
+        self.by_name = SortedNameIndex()
+        self.by_category_name: Dict[str, SortedNameIndex] = {}
+        self._keys: Dict[int, Tuple[str, Set[str], int, Set[str], NameKey]] = {}
+
+    def add(self, contact: Contact):
+        self.remove(contact.id)
+        category = contact.category.value
+        phone_types = {p.type.value for p in contact.phones}
+        phone_count = len(contact.phones)
+        name_key = (fold_name(contact.name), contact.id)
+        trigrams = name_trigrams(name_key[0])
+
+        self.by_category.setdefault(category, set()).add(contact.id)
+        for phone_type in phone_types:
+            self.by_phone_type.setdefault(phone_type, set()).add(contact.id)
+        self.by_phone_count.setdefault(phone_count, set()).add(contact.id)
+        for trigram in trigrams:
+            self.by_trigram.setdefault(trigram, set()).add(contact.id)
+        self.by_name.add(name_key)
+        self.by_category_name.setdefault(category, SortedNameIndex()).add(name_key)
+        self._keys[contact.id] = (category, phone_types, phone_count, trigrams, name_key)
+
+    def add_many(self, contacts: List[Contact]):
+        # Carga inicial: os conjuntos são montados numa única passada e os
+        # nomes são ordenados uma vez, em vez de um insort por contato.
+        if self._keys:
+            for contact in contacts:
+                self.add(contact)
+            return
+
+        category_values = {category: category.value for category in ContactCategory}
+        phone_type_values = {phone_type: phone_type.value for phone_type in PhoneType}
+        by_category = defaultdict(list)
+        by_phone_type = defaultdict(list)
+        by_phone_count = defaultdict(list)
+        by_trigram = defaultdict(list)
+        name_keys = defaultdict(list)
+
+        for contact in contacts:
+            contact_id = contact.id
+            category = category_values[contact.category]
+            phone_types = {phone_type_values[p.type] for p in contact.phones}
+            phone_count = len(contact.phones)
+            name_key = (fold_name(contact.name), contact_id)
+            trigrams = name_trigrams(name_key[0])
+
+            by_category[category].append(contact_id)
+            for phone_type in phone_types:
+                by_phone_type[phone_type].append(contact_id)
+            by_phone_count[phone_count].append(contact_id)
+            for trigram in trigrams:
+                by_trigram[trigram].append(contact_id)
+            name_keys[category].append(name_key)
+            self._keys[contact_id] = (category, phone_types, phone_count, trigrams, name_key)
+
+        self.by_category = {key: set(ids) for key, ids in by_category.items()}
+        self.by_phone_type = {key: set(ids) for key, ids in by_phone_type.items()}
+        self.by_phone_count = {key: set(ids) for key, ids in by_phone_count.items()}
+        self.by_trigram = {key: set(ids) for key, ids in by_trigram.items()}
+        all_keys = []
+        for category, keys in name_keys.items():
+            keys.sort()
+            self.by_category_name[category] = SortedNameIndex()
+            self.by_category_name[category].load_sorted(keys)
+            all_keys.extend(keys)
+        all_keys.sort()
+        self.by_name.load_sorted(all_keys)
+
+    def remove(self, contact_id: int):
+        keys = self._keys.pop(contact_id, None)
+        if keys is None:
+            return
+        category, phone_types, phone_count, trigrams, name_key = keys
+
+        _discard(self.by_category, category, contact_id)
+        for phone_type in phone_types:
+            _discard(self.by_phone_type, phone_type, contact_id)
+        _discard(self.by_phone_count, phone_count, contact_id)
+        for trigram in trigrams:
+            _discard(self.by_trigram, trigram, contact_id)
+        self.by_name.remove(name_key)
+        self.by_category_name[category].remove(name_key)
+
+    def name_index(self, category: Optional[str] = None) -> SortedNameIndex:
+        # A listagem ordenada filtrada por categoria percorre o índice da
+        # própria categoria, sem pular os contatos das outras.
+        if category is None:
+            return self.by_name
+        return self.by_category_name.get(category) or SortedNameIndex()
+
+def _discard(index: Dict, key, contact_id: int):
+    ids = index.get(key)
+    if ids is None:
+        return
+    ids.discard(contact_id)
+    if not ids:
+        del index[key]
+
+class QueryPlanner:
+    def __init__(self, contacts: Dict[int, Contact], index: ContactIndex):
+        self._contacts = contacts
+        self._index = index
+
+    def run(
+        self,
+        name: Optional[str] = None,
+        category: Optional[str] = None,
+        phone_type: Optional[str] = None,
+        min_phones: Optional[int] = None,
+        max_phones: Optional[int] = None
+    ) -> Tuple[List[Contact], Dict]:
+        # Cada critério oferece um conjunto candidato (quando há índice) e um
+        # predicado; o menor conjunto conduz a busca e os demais filtram.
+        # O índice de trigramas é aproximado, então o predicado de nome sempre roda.
+        drivers: List[Tuple[str, Callable[[], Set[int]], int, bool]] = []
+        predicates: List[Tuple[str, Callable[[Contact], bool]]] = []
+
+        if category is not None:
+            ids = self._index.by_category.get(category, set())
+            drivers.append(("category", lambda ids=ids: ids, len(ids), True))
+            predicates.append(("category", lambda c: c.category.value == category))
+
+        if phone_type is not None:
+            ids = self._index.by_phone_type.get(phone_type, set())
+            drivers.append(("phone_type", lambda ids=ids: ids, len(ids), True))
+            predicates.append(("phone_type", lambda c: any(p.type.value == phone_type for p in c.phones)))
+
+        if min_phones is not None or max_phones is not None:
+            low = min_phones if min_phones is not None else 0
+            high = max_phones if max_phones is not None else max(self._index.by_phone_count, default=0)
+            buckets = [ids for count, ids in self._index.by_phone_count.items() if low <= count <= high]
+            drivers.append(("phone_count", lambda buckets=buckets: set().union(*buckets), sum(map(len, buckets)), True))
+            predicates.append(("phone_count", lambda c: low <= len(c.phones) <= high))
+
+        if name is not None:
+            folded = fold_name(name)
+            trigrams = name_trigrams(folded)
+            if trigrams:
+                buckets = [self._index.by_trigram.get(t, set()) for t in trigrams]
+                smallest = min(buckets, key=len)
+                drivers.append(("name", lambda smallest=smallest: smallest, len(smallest), False))
+            predicates.append(("name", lambda c: folded in fold_name(c.name)))
+
+        if drivers:
+            driver, candidates_fn, _, exact = min(drivers, key=lambda d: d[2])
+            candidates = sorted(candidates_fn())
+        else:
+            driver, exact = "full_scan", False
+            candidates = list(self._contacts)
+
+        remaining = [(label, check) for label, check in predicates if not (exact and label == driver)]
+        contacts = self._contacts
+        results = [
+            contacts[cid] for cid in candidates
+            if all(check(contacts[cid]) for _, check in remaining)
+        ]
+
+        plan = {
+            "driver": driver,
+            "candidates": len(candidates),
+            "filters": [label for label, _ in remaining],
+            "matches": len(results)
+        }
+        return results, plan
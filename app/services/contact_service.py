@@ -1,14 +1,43 @@
-from typing import List, Optional, Dict
-from ..models.contact import Contact, ContactCreate, ContactUpdate, Phone
+from typing import List, Optional, Dict, Tuple, Callable
+from collections import OrderedDict
+from ..models.contact import (
+    Contact, ContactCreate, ContactUpdate, ContactBackup, ContactBulkSelection, Phone
+)
 from ..models.enums import PhoneType, ContactCategory
+from .change_log import ChangeLog
+from .contact_index import ContactIndex, QueryPlanner, NameKey, fold_name
+from .search_cache import SearchCache
+from .duplicate_detector import find_duplicate_clusters, DEFAULT_NAME_SIMILARITY
+from .snapshot import encode_snapshot, decode_snapshot, load_snapshot_file, gc_paused
+import heapq
 import json
+import os
+import uuid
 from datetime import datetime
 
+CONTACT_FIELDS = ("id", "name", "phones", "category")
+SNAPSHOT_PATH_ENV = "CONTACTS_SNAPSHOT_PATH"
+PROGRESS_CHUNK_SIZE = 1000
+
+ProgressCallback = Callable[[int, int], None]
+
 class ContactService:
     def __init__(self):
         self._contacts: Dict[int, Contact] = {}
         self._next_id = 1
-        self._load_sample_data()
+        self._changes = ChangeLog()
+        self._index = ContactIndex()
+        self._search_cache = SearchCache()
+        self._epoch = uuid.uuid4().hex[:12]
+        self._versions: "OrderedDict[int, int]" = OrderedDict()
+        self._tombstones: "OrderedDict[int, int]" = OrderedDict()
+        self._restored_token: Optional[str] = None
+        
+        snapshot_path = os.environ.get(SNAPSHOT_PATH_ENV)
+        if snapshot_path:
+            self.load_snapshot(snapshot_path)
+        else:
+            self._load_sample_data()
     
     def _load_sample_data(self):
         sample_contacts = [
@@ -62,6 +91,59 @@ class ContactService:
         for contact_data in sample_contacts:
             self.create_contact(contact_data)
     
+    def load_snapshot(self, path: str) -> int:
+        # Carga inicial em massa: não gera eventos no feed de alterações e todos
+        # os contatos ficam na versão 0, base para os backups incrementais. Roda
+        # antes de o servidor atender requisições, com o GC desligado só aqui.
+        with gc_paused():
+            contacts, _ = load_snapshot_file(path)
+            self._contacts.update((contact.id, contact) for contact in contacts)
+            self._versions.update((contact.id, 0) for contact in contacts)
+            self._index.add_many(contacts)
+        if contacts:
+            self._next_id = max(self._next_id, max(self._contacts) + 1)
+        return len(contacts)
+    
+    def _store_contacts(self, entries: List[Tuple[Contact, str]]):
+        changed_names = []
+        for contact, _ in entries:
+            previous = self._contacts.get(contact.id)
+            if previous is None or previous.name != contact.name:
+                changed_names.append(fold_name(contact.name))
+                if previous is not None:
+                    changed_names.append(fold_name(previous.name))
+        if changed_names:
+            self._search_cache.invalidate_names(*changed_names)
+        
+        versions = self._changes.record_many(
+            [(event_type, contact.id, self.serialize_contact(contact)) for contact, event_type in entries]
+        )
+        for (contact, _), version in zip(entries, versions):
+            self._contacts[contact.id] = contact
+            self._index.add(contact)
+            self._versions[contact.id] = version
+            self._versions.move_to_end(contact.id)
+            self._tombstones.pop(contact.id, None)
+    
+    def _store_contact(self, contact: Contact, event_type: str):
+        self._store_contacts([(contact, event_type)])
+    
+    def _remove_contacts(self, contact_ids: List[int]):
+        if not contact_ids:
+            return
+        self._search_cache.invalidate_names(*(fold_name(self._contacts[cid].name) for cid in contact_ids))
+        
+        versions = self._changes.record_many([("deleted", cid, None) for cid in contact_ids])
+        for contact_id, version in zip(contact_ids, versions):
+            del self._contacts[contact_id]
+            self._index.remove(contact_id)
+            self._versions.pop(contact_id, None)
+            self._tombstones[contact_id] = version
+            self._tombstones.move_to_end(contact_id)
+    
+    def _remove_contact(self, contact_id: int):
+        self._remove_contacts([contact_id])
+    
     def create_contact(self, contact_data: ContactCreate) -> Contact:
         contact = Contact(
             id=self._next_id,
@@ -69,61 +151,193 @@ class ContactService:
             phones=contact_data.phones,
             category=contact_data.category
         )
-        self._contacts[self._next_id] = contact
         self._next_id += 1
+        self._store_contact(contact, "created")
         return contact
     
     def get_contact(self, contact_id: int) -> Optional[Contact]:
         return self._contacts.get(contact_id)
     
+    def get_contacts_by_ids(self, contact_ids: List[int]) -> Tuple[List[Contact], List[int]]:
+        found = []
+        missing = []
+        for contact_id in dict.fromkeys(contact_ids):
+            contact = self.get_contact(contact_id)
+            if contact is None:
+                missing.append(contact_id)
+            else:
+                found.append(contact)
+        return found, missing
+    
     def get_all_contacts(self) -> List[Contact]:
         return list(self._contacts.values())
     
     def search_contacts_by_name(self, name_query: str) -> List[Contact]:
-        name_query = name_query.lower().strip()
-        return [
+        name_query = fold_name(name_query)
+        cached_ids = self._search_cache.get(name_query)
+        if cached_ids is not None:
+            return [self._contacts[contact_id] for contact_id in cached_ids]
+        
+        contacts = [
             contact for contact in self._contacts.values()
             if name_query in contact.name.lower()
         ]
+        self._search_cache.put(name_query, [contact.id for contact in contacts])
+        return contacts
+    
+    def get_search_cache_stats(self) -> Dict:
+        return self._search_cache.stats()
     
     def update_contact(self, contact_id: int, contact_data: ContactUpdate) -> Optional[Contact]:
         if contact_id not in self._contacts:
             return None
         
-        contact = self._contacts[contact_id]
         update_data = contact_data.dict(exclude_unset=True)
+        contact = self._contacts[contact_id].copy(
+            update={field: getattr(contact_data, field) for field in update_data}
+        )
         
-        for field, value in update_data.items():
-            setattr(contact, field, value)
-        
+        self._store_contact(contact, "updated")
         return contact
     
     def delete_contact(self, contact_id: int) -> bool:
         if contact_id in self._contacts:
-            del self._contacts[contact_id]
+            self._remove_contact(contact_id)
             return True
         return False
     
+    def _select_contact_ids(self, selection: ContactBulkSelection) -> Tuple[List[int], List[int]]:
+        if selection.ids is not None:
+            contact_ids = list(dict.fromkeys(selection.ids))
+            missing = [cid for cid in contact_ids if cid not in self._contacts]
+            return contact_ids, missing
+        
+        criteria = selection.filter
+        contacts, _ = QueryPlanner(self._contacts, self._index).run(
+            name=criteria.name,
+            category=criteria.category.value if criteria.category else None,
+            phone_type=criteria.phone_type.value if criteria.phone_type else None,
+            min_phones=criteria.min_phones,
+            max_phones=criteria.max_phones
+        )
+        return [contact.id for contact in contacts], []
+    
+    def bulk_update_contacts(
+        self, selection: ContactBulkSelection, contact_data: ContactUpdate
+    ) -> Tuple[List[Contact], List[int]]:
+        contact_ids, missing = self._select_contact_ids(selection)
+        if missing:
+            return [], missing
+        
+        # Todas as cópias são montadas antes de gravar: se algo falhar aqui,
+        # nenhum contato do lote é alterado.
+        update_data = contact_data.dict(exclude_unset=True)
+        changes = {field: getattr(contact_data, field) for field in update_data}
+        updated = [self._contacts[cid].copy(update=changes) for cid in contact_ids]
+        
+        self._store_contacts([(contact, "updated") for contact in updated])
+        return updated, []
+    
+    def bulk_delete_contacts(self, selection: ContactBulkSelection) -> Tuple[List[int], List[int]]:
+        contact_ids, missing = self._select_contact_ids(selection)
+        if missing:
+            return [], missing
+        
+        self._remove_contacts(contact_ids)
+        return contact_ids, []
+    
+    def list_contacts_by_name(
+        self,
+        descending: bool = False,
+        after: Optional[NameKey] = None,
+        limit: Optional[int] = None,
+        category: Optional[str] = None
+    ) -> Tuple[List[Contact], Optional[NameKey]]:
+        index = self._index.name_index(category)
+        keys = index.iter_before(after) if descending else index.iter_after(after)
+        page = []
+        last_key = None
+        for key in keys:
+            if limit is not None and len(page) == limit:
+                return page, last_key
+            page.append(self._contacts[key[1]])
+            last_key = key
+        return page, None
+    
     def get_contacts_by_category(self, category: str) -> List[Contact]:
         return [contact for contact in self._contacts.values() 
                 if contact.category.value == category]
     
-    def get_statistics(self) -> Dict:
-        total_contacts = len(self._contacts)
+    def query_contacts(
+        self,
+        name: Optional[str] = None,
+        category: Optional[str] = None,
+        phone_type: Optional[str] = None,
+        min_phones: Optional[int] = None,
+        max_phones: Optional[int] = None,
+        sort: str = "id",
+        limit: Optional[int] = None
+    ) -> Tuple[List[Contact], int, Dict]:
+        results, plan = QueryPlanner(self._contacts, self._index).run(
+            name=name,
+            category=category,
+            phone_type=phone_type,
+            min_phones=min_phones,
+            max_phones=max_phones
+        )
         
-        category_stats = {}
-        for category in ContactCategory:
-            count = len([c for c in self._contacts.values() if c.category == category])
-            category_stats[category.value] = count
+        descending = sort.startswith("-")
+        if sort.lstrip("-") == "name":
+            key = lambda c: (fold_name(c.name), c.id)
+        else:
+            key = lambda c: c.id
         
-        phone_type_stats = {}
-        for phone_type in PhoneType:
-            count = 0
-            for contact in self._contacts.values():
-                count += len([p for p in contact.phones if p.type == phone_type])
-            phone_type_stats[phone_type.value] = count
+        if limit is not None and limit < len(results):
+            select = heapq.nlargest if descending else heapq.nsmallest
+            page = select(limit, results, key=key)
+        else:
+            page = sorted(results, key=key, reverse=descending)
         
-        multi_phone_contacts = len([c for c in self._contacts.values() if len(c.phones) > 1])
+        return page, len(results), plan
+    
+    def get_changes(self, since: int, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        return self._changes.get_since(since, limit)
+    
+    def get_latest_sequence(self) -> int:
+        return self._changes.latest_sequence
+    
+    async def wait_for_changes(self, since: int, timeout: float) -> bool:
+        return await self._changes.wait_for_change(since, timeout)
+    
+    def snapshot(self) -> Tuple[List[Contact], Dict]:
+        # Contatos nunca são alterados no lugar (update_contact cria uma cópia),
+        # então a lista pode ser processada fora do event loop com segurança.
+        return list(self._contacts.values()), {
+            "sequence": self._changes.latest_sequence,
+            "backup_token": self._backup_token()
+        }
+    
+    def get_statistics(
+        self,
+        snapshot: Optional[Tuple[List[Contact], Dict]] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        contacts, _ = snapshot or self.snapshot()
+        total_contacts = len(contacts)
+        
+        category_stats = {category.value: 0 for category in ContactCategory}
+        phone_type_stats = {phone_type.value: 0 for phone_type in PhoneType}
+        multi_phone_contacts = 0
+        
+        for start in range(0, total_contacts, PROGRESS_CHUNK_SIZE):
+            for contact in contacts[start:start + PROGRESS_CHUNK_SIZE]:
+                category_stats[contact.category.value] += 1
+                for phone in contact.phones:
+                    phone_type_stats[phone.type.value] += 1
+                if len(contact.phones) > 1:
+                    multi_phone_contacts += 1
+            if progress:
+                progress(min(start + PROGRESS_CHUNK_SIZE, total_contacts), total_contacts)
         
         return {
             "total_contatos": total_contacts,
@@ -133,21 +347,143 @@ class ContactService:
             "ultima_atualizacao": datetime.now().isoformat()
         }
     
-    def export_contacts(self) -> Dict:
+    def find_duplicates(
+        self,
+        threshold: float = DEFAULT_NAME_SIMILARITY,
+        snapshot: Optional[Tuple[List[Contact], Dict]] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        contacts, _ = snapshot or self.snapshot()
+        names = {contact.id: contact.name for contact in contacts}
+        clusters, blocking = find_duplicate_clusters(contacts, threshold, progress)
+        for cluster in clusters:
+            cluster["names"] = [names[contact_id] for contact_id in cluster["contact_ids"]]
+        
+        return {
+            "total_contatos": len(contacts),
+            "total_clusters": len(clusters),
+            "contatos_duplicados": sum(len(c["contact_ids"]) for c in clusters),
+            "blocking": blocking,
+            "clusters": clusters
+        }
+    
+    def serialize_contact(self, contact: Contact, fields: Optional[List[str]] = None) -> Dict:
+        fields = fields or CONTACT_FIELDS
+        contact_dict = {}
+        for field in fields:
+            if field == "phones":
+                contact_dict["phones"] = [{"number": p.number, "type": p.type.value} for p in contact.phones]
+            elif field == "category":
+                contact_dict["category"] = contact.category.value
+            else:
+                contact_dict[field] = getattr(contact, field)
+        return contact_dict
+    
+    def serialize_contacts(self, contacts: List[Contact], fields: Optional[List[str]] = None) -> List[Dict]:
+        return [self.serialize_contact(contact, fields) for contact in contacts]
+    
+    def _backup_token(self) -> str:
+        return f"{self._epoch}-{self._changes.latest_sequence}"
+    
+    def _parse_backup_token(self, token: str) -> Optional[int]:
+        epoch, _, sequence = token.rpartition("-")
+        if epoch != self._epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._changes.latest_sequence:
+            return None
+        return sequence
+    
+    def export_contacts(
+        self,
+        fields: Optional[List[str]] = None,
+        snapshot: Optional[Tuple[List[Contact], Dict]] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        contacts, meta = snapshot or self.snapshot()
         contacts_data = []
-        for contact in self._contacts.values():
-            contact_dict = {
-                "id": contact.id,
-                "name": contact.name,
-                "phones": [{"number": p.number, "type": p.type.value} for p in contact.phones],
-                "category": contact.category.value
-            }
-            contacts_data.append(contact_dict)
+        for start in range(0, len(contacts), PROGRESS_CHUNK_SIZE):
+            contacts_data.extend(self.serialize_contacts(contacts[start:start + PROGRESS_CHUNK_SIZE], fields))
+            if progress:
+                progress(len(contacts_data), len(contacts))
         
         return {
             "export_timestamp": datetime.now().isoformat(),
+            "backup_type": "full",
+            "backup_token": meta["backup_token"],
+            "sequence": meta["sequence"],
             "total_contacts": len(contacts_data),
             "contacts": contacts_data
         }
+    
+    def export_snapshot(self) -> Tuple[bytes, str]:
+        contacts, meta = self.snapshot()
+        return encode_snapshot(contacts, meta["sequence"]), meta["backup_token"]
+    
+    def parse_snapshot_backup(self, payload: bytes, backup_token: Optional[str] = None) -> ContactBackup:
+        # Diferente da carga na inicialização, o snapshot vem de fora: os
+        # contatos passam pelas mesmas validações do restore em JSON.
+        contacts, meta = decode_snapshot(payload)
+        return ContactBackup(
+            backup_type="full",
+            backup_token=backup_token or f"snapshot-{meta['sequence']}",
+            contacts=self.serialize_contacts(contacts)
+        )
+    
+    def export_incremental(self, since_token: str, fields: Optional[List[str]] = None) -> Optional[Dict]:
+        since = self._parse_backup_token(since_token)
+        if since is None:
+            return None
+        
+        changed_ids = []
+        for contact_id, version in reversed(self._versions.items()):
+            if version <= since:
+                break
+            changed_ids.append(contact_id)
+        
+        deleted_ids = []
+        for contact_id, version in reversed(self._tombstones.items()):
+            if version <= since:
+                break
+            deleted_ids.append(contact_id)
+        
+        contacts_data = self.serialize_contacts([self._contacts[cid] for cid in reversed(changed_ids)], fields)
+        
+        return {
+            "export_timestamp": datetime.now().isoformat(),
+            "backup_type": "incremental",
+            "base_token": since_token,
+            "backup_token": self._backup_token(),
+            "sequence": self._changes.latest_sequence,
+            "total_contacts": len(contacts_data),
+            "contacts": contacts_data,
+            "deleted_ids": deleted_ids[::-1]
+        }
+    
+    def restore_backup(self, backup: ContactBackup) -> Optional[Dict]:
+        if backup.backup_type == "incremental" and backup.base_token != self._restored_token:
+            return None
+        
+        restored_ids = {contact.id for contact in backup.contacts}
+        deleted_ids = [cid for cid in backup.deleted_ids if cid in self._contacts and cid not in restored_ids]
+        if backup.backup_type == "full":
+            deleted_ids = [cid for cid in self._contacts if cid not in restored_ids]
+        
+        self._remove_contacts(deleted_ids)
+        self._store_contacts([
+            (Contact(**contact.dict()), "updated" if contact.id in self._contacts else "created")
+            for contact in backup.contacts
+        ])
+        if backup.contacts:
+            self._next_id = max(self._next_id, max(restored_ids) + 1)
+        
+        self._restored_token = backup.backup_token
+        return {
+            "backup_type": backup.backup_type,
+            "backup_token": backup.backup_token,
+            "restored_contacts": len(backup.contacts),
+            "deleted_contacts": len(deleted_ids),
+            "total_contacts": len(self._contacts)
+        }
 
 contact_service = ContactService() 
\ No newline at end of file
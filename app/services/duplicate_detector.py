@@ -0,0 +1,212 @@
+from typing import List, Optional, Dict, Set, Tuple, Callable, Iterator
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import combinations
+import re
+import unicodedata
+from ..models.contact import Contact
+
+DEFAULT_NAME_SIMILARITY = 0.88
+SORTED_NEIGHBORHOOD_WINDOW = 8
+MAX_BLOCK_SIZE = 2 * SORTED_NEIGHBORHOOD_WINDOW
+PROGRESS_STEP = 1000
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NAME_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+_NON_DIGIT = re.compile(r"[^\d]")
+_DIGRAPHS = [(re.compile(pattern), replacement) for pattern, replacement in
+             (("ph", "f"), ("ch|sh", "x"), ("lh", "li"), ("nh", "ni"))]
+_VOWELS = re.compile(r"[aeiou]")
+_REPEATED = re.compile(r"(.)\1+")
+
+def normalize_name(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    ascii_name = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_ALNUM.sub(" ", ascii_name).split())
+
+def _char_counts(name: str) -> Tuple[int, ...]:
+    # Nomes normalizados só têm [a-z0-9 ]: a soma dos mínimos destes vetores é
+    # o mesmo limite superior que SequenceMatcher.quick_ratio() calcula.
+    return tuple(map(name.count, _NAME_ALPHABET))
+
+def normalize_phone(number: str) -> str:
+    return _NON_DIGIT.sub("", number)
+
+@lru_cache(maxsize=200_000)
+def phonetic_key(token: str) -> str:
+    for pattern, replacement in _DIGRAPHS:
+        token = pattern.sub(replacement, token)
+    token = token.translate(str.maketrans("yzwq", "isvk")).replace("h", "")
+    head, tail = token[:1], _VOWELS.sub("", token[1:])
+    return _REPEATED.sub(r"\1", head + tail)
+
+def _long_tokens(name: str) -> Tuple[str, ...]:
+    return tuple(phonetic_key(token) for token in name.split() if len(token) > 3)
+
+def _one_token_apart(first: Tuple[str, ...], second: Tuple[str, ...]) -> bool:
+    # Mesma premissa dos blocos, mas respeitando a ordem e ignorando partículas
+    # ("da", "dos"): no máximo um token trocado, inserido ou removido. Tokens
+    # reordenados ou dois nomes diferentes quase nunca chegam ao limiar de
+    # ratio() e eram a maioria das comparações feitas nos blocos.
+    if len(first) < len(second):
+        first, second = second, first
+    if len(first) - len(second) > 1:
+        return False
+    for i, (a, b) in enumerate(zip(first, second)):
+        if a != b:
+            if len(first) == len(second):
+                return first[i + 1:] == second[i + 1:]
+            return first[i + 1:] == second[i:]
+    return True
+
+def blocking_keys(name: str) -> Set[str]:
+    # Nomes quase idênticos diferem em no máximo um token (ou têm grafias com a
+    # mesma chave fonética): com 3+ tokens, cada chave omite um deles. Com 2
+    # tokens, a chave composta reúne os nomes em que ambos conferem e as chaves
+    # de um token só cobrem a troca de um deles.
+    tokens = sorted({phonetic_key(token) for token in name.split() if len(token) >= 2})
+    if len(tokens) < 3:
+        keys = set(tokens)
+        if len(tokens) == 2:
+            keys.add(" ".join(tokens))
+        return keys
+    return {" ".join(combo) for combo in combinations(tokens, len(tokens) - 1)}
+
+def _candidate_pairs(ids: List[int], names: Dict[int, str]) -> Iterator[Tuple[int, List[int]]]:
+    # Blocos pequenos são comparados por completo. Nos grandes (nomes ou
+    # sobrenomes muito comuns) cada nome só é comparado com os vizinhos na
+    # ordem alfabética, o que mantém o custo linear no tamanho do bloco.
+    if len(ids) <= MAX_BLOCK_SIZE:
+        for i, first in enumerate(ids):
+            yield first, ids[i + 1:]
+        return
+    ordered = sorted(ids, key=names.__getitem__)
+    for i, first in enumerate(ordered):
+        yield first, ordered[i + 1:i + 1 + SORTED_NEIGHBORHOOD_WINDOW]
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        root = self.parent.setdefault(item, item)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def find_duplicate_clusters(
+    contacts: List[Contact],
+    threshold: float = DEFAULT_NAME_SIMILARITY,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Tuple[List[Dict], Dict]:
+    # Passo 1: agrupa por chaves exatas (dígitos do telefone e nome normalizado)
+    # em tabelas hash. Passo 2: compara nomes par a par apenas dentro de blocos
+    # que compartilham chaves fonéticas; blocos grandes só entre vizinhos.
+    total = len(contacts)
+    by_phone: Dict[str, List[int]] = {}
+    by_name: Dict[str, List[int]] = {}
+    blocks: Dict[str, List[int]] = {}
+    names: Dict[int, str] = {}
+
+    for position, contact in enumerate(contacts, 1):
+        for phone in contact.phones:
+            by_phone.setdefault(normalize_phone(phone.number), []).append(contact.id)
+        name = normalize_name(contact.name)
+        names[contact.id] = name
+        by_name.setdefault(name, []).append(contact.id)
+        if progress and position % PROGRESS_STEP == 0:
+            progress(position // 2, total)
+
+    groups = _UnionFind()
+    shared_phones: Dict[int, Set[str]] = {}
+    similar_names: Set[int] = set()
+    counts: Dict[int, Tuple[int, ...]] = {}
+    tokens: Dict[int, Tuple[str, ...]] = {}
+
+    for digits, ids in by_phone.items():
+        ids = list(dict.fromkeys(ids))
+        for other in ids[1:]:
+            groups.union(ids[0], other)
+        if len(ids) > 1:
+            shared_phones.setdefault(ids[0], set()).add(digits)
+
+    for name, ids in by_name.items():
+        for other in ids[1:]:
+            groups.union(ids[0], other)
+        if len(ids) > 1:
+            similar_names.add(ids[0])
+        counts[ids[0]] = _char_counts(name)
+        tokens[ids[0]] = _long_tokens(name)
+        for key in blocking_keys(name):
+            blocks.setdefault(key, []).append(ids[0])
+
+    matcher = SequenceMatcher(autojunk=False)
+    partial_blocks = 0
+    for position, ids in enumerate(blocks.values(), 1):
+        if len(ids) > MAX_BLOCK_SIZE:
+            partial_blocks += 1
+        for first, candidates in _candidate_pairs(ids, names):
+            first_length = len(names[first])
+            first_counts, first_tokens = counts[first], tokens[first]
+            matcher_ready = False
+            for second in candidates:
+                second_length = len(names[second])
+                bound = threshold * (first_length + second_length)
+                if 2 * min(first_length, second_length) < bound:
+                    continue
+                if not _one_token_apart(first_tokens, tokens[second]):
+                    continue
+                if 2 * sum(map(min, first_counts, counts[second])) < bound:
+                    continue
+                if groups.find(first) == groups.find(second):
+                    continue
+                if not matcher_ready:
+                    matcher.set_seq2(names[first])
+                    matcher_ready = True
+                matcher.set_seq1(names[second])
+                if matcher.ratio() >= threshold:
+                    groups.union(first, second)
+                    similar_names.add(first)
+        if progress and position % PROGRESS_STEP == 0:
+            progress(total // 2 + (position * total) // (2 * len(blocks)), total)
+
+    members: Dict[int, List[int]] = {}
+    for contact in contacts:
+        members.setdefault(groups.find(contact.id), []).append(contact.id)
+
+    root_phones: Dict[int, Set[str]] = {}
+    for contact_id, digits in shared_phones.items():
+        root_phones.setdefault(groups.find(contact_id), set()).update(digits)
+    root_names = {groups.find(contact_id) for contact_id in similar_names}
+
+    clusters = []
+    for root, ids in members.items():
+        if len(ids) < 2:
+            continue
+        reasons = []
+        if root in root_phones:
+            reasons.append("telefone")
+        if root in root_names:
+            reasons.append("nome")
+        clusters.append({
+            "contact_ids": ids,
+            "reasons": reasons,
+            "shared_phones": sorted(root_phones.get(root, ()))
+        })
+
+    if progress:
+        progress(total, total)
+    blocking = {
+        "blocks": len(blocks),
+        "partial_blocks": partial_blocks,
+        "max_block_size": MAX_BLOCK_SIZE,
+        "window": SORTED_NEIGHBORHOOD_WINDOW
+    }
+    return sorted(clusters, key=lambda c: c["contact_ids"][0]), blocking
@@ -0,0 +1,214 @@
+from typing import Optional, Dict, List, Tuple, Callable, Iterator, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from pydantic import ValidationError
+from ..models.job import Job
+from ..models.enums import JobType, JobStatus
+from ..models.contact import ContactCreate
+from .contact_service import contact_service, PROGRESS_CHUNK_SIZE
+from .duplicate_detector import DEFAULT_NAME_SIMILARITY
+
+MAX_WORKERS = 2
+MAX_STORED_JOBS = 100
+MAX_STORED_RESULT_BYTES = 256 * 1024 * 1024
+RESULT_TTL_SECONDS = 3600.0
+
+_IMPORT_START = re.compile(r'\s*\{\s*"contacts"\s*:\s*\[\s*')
+_IMPORT_SEPARATOR = re.compile(r"\s*([,\]])\s*")
+_IMPORT_END = re.compile(r"\s*\}\s*")
+
+class JobContext:
+    def __init__(self, job: Job, loop: asyncio.AbstractEventLoop):
+        self._job = job
+        self._loop = loop
+
+    def set_progress(self, processed: int, total: int):
+        self._job.processed = processed
+        self._job.total = total
+        self._job.progress = round(processed / total, 4) if total else 1.0
+
+    def call_on_loop(self, fn: Callable, *args) -> Any:
+        # O armazenamento de contatos só é alterado pelo event loop; os workers
+        # enviam as escritas para lá em vez de usar travas.
+        async def call():
+            return fn(*args)
+        return asyncio.run_coroutine_threadsafe(call(), self._loop).result()
+
+class JobService:
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_jobs: int = MAX_STORED_JOBS,
+        max_result_bytes: int = MAX_STORED_RESULT_BYTES,
+        result_ttl: float = RESULT_TTL_SECONDS
+    ):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="contacts-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._results: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._result_bytes = 0
+        self._results_lock = threading.Lock()
+        self._max_jobs = max_jobs
+        self._max_result_bytes = max_result_bytes
+        self._result_ttl = result_ttl
+
+    def submit(self, job_type: JobType, fn: Callable[[JobContext], Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex, type=job_type, created_at=datetime.now().isoformat())
+        self._jobs[job.id] = job
+        self._evict_finished()
+
+        context = JobContext(job, asyncio.get_running_loop())
+        self._executor.submit(self._run, job, fn, context)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[JobContext], Any], context: JobContext):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now().isoformat()
+        try:
+            # O resultado já sai serializado do worker: gerar o JSON de uma
+            # exportação grande no download travaria o event loop.
+            self._store_result(job, _encode_result(fn(context)).encode("utf-8"))
+            job.progress = 1.0
+            job.status = JobStatus.COMPLETED
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job.status in (JobStatus.COMPLETED, JobStatus.FAILED)]
+        for job_id in finished[:max(0, len(self._jobs) - self._max_jobs)]:
+            with self._results_lock:
+                self._drop_result(job_id)
+            del self._jobs[job_id]
+
+    def _store_result(self, job: Job, content: bytes):
+        with self._results_lock:
+            self._results[job.id] = (content, time.monotonic() + self._result_ttl)
+            self._result_bytes += len(content)
+            job.result_url = f"/contacts/jobs/{job.id}/result"
+            self._evict_results(keep=job.id)
+
+    def _evict_results(self, keep: Optional[str] = None):
+        # Resultados expirados saem primeiro; depois, os mais antigos até
+        # caber no limite de memória. O resultado recém-gerado sempre fica.
+        now = time.monotonic()
+        for job_id, (_, expires_at) in list(self._results.items()):
+            if job_id == keep or (expires_at > now and self._result_bytes <= self._max_result_bytes):
+                break
+            self._drop_result(job_id)
+
+    def _drop_result(self, job_id: str):
+        entry = self._results.pop(job_id, None)
+        if entry is None:
+            return
+        self._result_bytes -= len(entry[0])
+        job = self._jobs.get(job_id)
+        if job:
+            job.result_url = None
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def get_all_jobs(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def get_result(self, job_id: str) -> Optional[bytes]:
+        with self._results_lock:
+            self._evict_results()
+            entry = self._results.get(job_id)
+        return entry[0] if entry else None
+
+    def submit_export(self, fields: Optional[List[str]] = None) -> Job:
+        def run(context: JobContext):
+            snapshot = context.call_on_loop(contact_service.snapshot)
+            return contact_service.export_contacts(fields, snapshot=snapshot, progress=context.set_progress)
+        return self.submit(JobType.EXPORT, run)
+
+    def submit_statistics(self) -> Job:
+        def run(context: JobContext):
+            snapshot = context.call_on_loop(contact_service.snapshot)
+            return contact_service.get_statistics(snapshot=snapshot, progress=context.set_progress)
+        return self.submit(JobType.STATISTICS, run)
+
+    def submit_duplicates(self, threshold: float = DEFAULT_NAME_SIMILARITY) -> Job:
+        def run(context: JobContext):
+            snapshot = context.call_on_loop(contact_service.snapshot)
+            return contact_service.find_duplicates(threshold, snapshot=snapshot, progress=context.set_progress)
+        return self.submit(JobType.DUPLICATES, run)
+
+    def submit_import(self, payload: bytes) -> Job:
+        text, position = _open_import_payload(payload)
+        
+        def run(context: JobContext):
+            # Todo o lote é validado antes de criar qualquer contato.
+            contacts = []
+            for index, item in enumerate(_iter_import_contacts(text, position)):
+                try:
+                    contacts.append(ContactCreate.parse_obj(item))
+                except ValidationError as e:
+                    raise ValueError(f"Contato na posição {index} inválido: {e}")
+            
+            created_ids = []
+            for start in range(0, len(contacts), PROGRESS_CHUNK_SIZE):
+                chunk = contacts[start:start + PROGRESS_CHUNK_SIZE]
+                created = context.call_on_loop(
+                    lambda chunk=chunk: [contact_service.create_contact(c).id for c in chunk]
+                )
+                created_ids.extend(created)
+                context.set_progress(len(created_ids), len(contacts))
+            return {"imported_contacts": len(created_ids), "created_ids": created_ids}
+        return self.submit(JobType.IMPORT, run)
+
+_dumps = partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+
+def _encode_result(value: Any) -> str:
+    # Um único json.dumps seguraria o GIL até o fim; listas grandes vão em
+    # pedaços para que o event loop rode entre eles.
+    if isinstance(value, dict):
+        items = (f"{_dumps(key if isinstance(key, str) else _dumps(key))}:{_encode_result(item)}"
+                 for key, item in value.items())
+        return "{" + ",".join(items) + "}"
+    if isinstance(value, list) and len(value) > PROGRESS_CHUNK_SIZE:
+        chunks = (_dumps(value[start:start + PROGRESS_CHUNK_SIZE])[1:-1]
+                  for start in range(0, len(value), PROGRESS_CHUNK_SIZE))
+        return "[" + ",".join(chunks) + "]"
+    return _dumps(value)
+
+def _open_import_payload(payload: bytes) -> Tuple[str, int]:
+    try:
+        text = payload.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValueError("O corpo da importação deve estar em UTF-8")
+    start = _IMPORT_START.match(text)
+    if not start:
+        raise ValueError('O corpo da importação deve ser um objeto JSON no formato {"contacts": [...]}')
+    if text.startswith("]", start.end()):
+        raise ValueError("Nenhum contato para importar")
+    return text, start.end()
+
+def _iter_import_contacts(text: str, position: int) -> Iterator[Any]:
+    # Pelo mesmo motivo de _encode_result, a lista é lida um contato por vez.
+    decoder = json.JSONDecoder()
+    while True:
+        item, position = decoder.raw_decode(text, position)
+        yield item
+        separator = _IMPORT_SEPARATOR.match(text, position)
+        if not separator:
+            raise ValueError(f"JSON inválido: esperado ',' ou ']' na posição {position}")
+        position = separator.end()
+        if separator.group(1) == "]":
+            break
+    if not _IMPORT_END.fullmatch(text, position):
+        raise ValueError(f"JSON inválido: esperado '}}' no fim do corpo (posição {position})")
+
+job_service = JobService()
@@ -0,0 +1,63 @@
+from typing import List, Optional, Dict, Tuple
+from collections import OrderedDict
+import time
+
+SEARCH_CACHE_MAX_ENTRIES = 1024
+SEARCH_CACHE_TTL_SECONDS = 300.0
+BULK_INVALIDATION_THRESHOLD = 64
+
+class SearchCache:
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES, ttl: float = SEARCH_CACHE_TTL_SECONDS):
+        self._entries: "OrderedDict[str, Tuple[List[int], float]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, query: str) -> Optional[List[int]]:
+        entry = self._entries.get(query)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[query]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(query)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, query: str, contact_ids: List[int]):
+        self._entries[query] = (contact_ids, time.monotonic() + self._ttl)
+        self._entries.move_to_end(query)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_names(self, *folded_names: str):
+        # Uma busca só muda de resultado se o nome antigo ou o novo do contato
+        # contém o termo; as demais entradas continuam válidas. Em lotes grandes
+        # é mais barato descartar o cache inteiro.
+        if len(folded_names) > BULK_INVALIDATION_THRESHOLD:
+            stale = list(self._entries)
+        else:
+            stale = [query for query in self._entries
+                     if any(query in name for name in folded_names)]
+        for query in stale:
+            del self._entries[query]
+        self.invalidations += len(stale)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "ttl_seconds": self._ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,163 @@
+from typing import List, Dict, Tuple, Iterator
+from array import array
+from contextlib import contextmanager
+import gc
+import mmap
+import os
+import struct
+import sys
+import zlib
+from ..models.contact import Contact, Phone
+from ..models.enums import PhoneType, ContactCategory
+
+# Formato binário (little-endian):
+#   cabeçalho  MAGIC, versão, nº de contatos, nº de telefones, nº de strings,
+#              tamanho da tabela de strings, sequência, CRC32 do corpo
+#   corpo      tabela de strings UTF-8 separadas por NUL, seguida das colunas
+#              ids (u32), nome (u32, índice na tabela), categoria (u8),
+#              início dos telefones (u32, n+1), número (u32) e tipo (u8)
+SNAPSHOT_MAGIC = b"CTSNAP\x00\x00"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MEDIA_TYPE = "application/vnd.contacts.snapshot"
+
+_HEADER = struct.Struct("<8sHIIIIQI")
+_MAX_U32 = 0xFFFFFFFF
+_CATEGORIES = list(ContactCategory)
+_PHONE_TYPES = list(PhoneType)
+_CATEGORY_CODES = {category: code for code, category in enumerate(_CATEGORIES)}
+_PHONE_TYPE_CODES = {phone_type: code for code, phone_type in enumerate(_PHONE_TYPES)}
+
+class SnapshotError(ValueError):
+    pass
+
+def _column(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def _to_list(section: memoryview, typecode: str) -> list:
+    if sys.byteorder == "big":
+        column = array(typecode, section.tobytes())
+        column.byteswap()
+        return column.tolist()
+    return section.cast(typecode).tolist()
+
+def encode_snapshot(contacts: List[Contact], sequence: int = 0) -> bytes:
+    strings: Dict[str, int] = {}
+    intern = lambda text: strings.setdefault(text, len(strings))
+
+    ids = [contact.id for contact in contacts]
+    if ids and (min(ids) < 0 or max(ids) > _MAX_U32):
+        raise SnapshotError(f"O formato binário só aceita IDs de 0 a {_MAX_U32}")
+
+    name_refs = [intern(contact.name) for contact in contacts]
+    phone_starts = [0]
+    number_refs = []
+    phone_types = []
+    for contact in contacts:
+        for phone in contact.phones:
+            number_refs.append(intern(phone.number))
+            phone_types.append(_PHONE_TYPE_CODES[phone.type])
+        phone_starts.append(len(number_refs))
+
+    joined = "\x00".join(strings)
+    if joined.count("\x00") != max(len(strings) - 1, 0):
+        raise SnapshotError("O formato binário não aceita o caractere NUL em nomes ou telefones")
+    string_table = joined.encode("utf-8")
+    body = b"".join([
+        string_table,
+        _column("I", ids),
+        _column("I", name_refs),
+        bytes(_CATEGORY_CODES[contact.category] for contact in contacts),
+        _column("I", phone_starts),
+        _column("I", number_refs),
+        bytes(phone_types),
+    ])
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(contacts), len(number_refs),
+        len(strings), len(string_table), sequence, zlib.crc32(body)
+    )
+    return header + body
+
+def decode_snapshot(buffer) -> Tuple[List[Contact], Dict]:
+    # Todas as fatias do buffer são liberadas antes de sair, mesmo em caso de
+    # erro; do contrário o mmap do chamador não consegue fechar e o
+    # SnapshotError original se perde num BufferError.
+    with memoryview(buffer) as view:
+        if len(view) < _HEADER.size:
+            raise SnapshotError("Arquivo de snapshot truncado")
+        magic, version, contact_count, phone_count, string_count, table_size, sequence, checksum = \
+            _HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Arquivo não é um snapshot de contatos")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Versão de snapshot não suportada: {version}")
+
+        sections = [view[_HEADER.size:]]
+        try:
+            body = sections[0]
+            expected_size = table_size + contact_count * 9 + (contact_count + 1) * 4 + phone_count * 5
+            if len(body) != expected_size:
+                raise SnapshotError("Tamanho do snapshot não confere com o cabeçalho")
+            if zlib.crc32(body) != checksum:
+                raise SnapshotError("Checksum do snapshot inválido")
+
+            offset = 0
+            for size in (table_size, contact_count * 4, contact_count * 4, contact_count,
+                         (contact_count + 1) * 4, phone_count * 4, phone_count):
+                sections.append(body[offset:offset + size])
+                offset += size
+            return _build_contacts(*sections[1:], string_count), \
+                {"sequence": sequence, "total_contacts": contact_count}
+        finally:
+            for section in sections:
+                section.release()
+
+def _build_contacts(
+    table: memoryview, ids: memoryview, name_refs: memoryview, categories: memoryview,
+    phone_starts: memoryview, number_refs: memoryview, phone_types: memoryview, string_count: int
+) -> List[Contact]:
+    strings = str(table, "utf-8").split("\x00") if string_count else []
+    if len(strings) != string_count:
+        raise SnapshotError("Tabela de strings corrompida")
+
+    # Os dados já foram validados ao gerar o snapshot e o checksum confere,
+    # então os modelos são montados sem revalidar cada campo.
+    phones = [
+        Phone.model_construct(number=strings[number_ref], type=_PHONE_TYPES[phone_type])
+        for number_ref, phone_type in zip(_to_list(number_refs, "I"), phone_types.tolist())
+    ]
+    starts = _to_list(phone_starts, "I")
+    return [
+        Contact.model_construct(
+            id=contact_id,
+            name=strings[name_ref],
+            phones=phones[start:end],
+            category=_CATEGORIES[category]
+        )
+        for contact_id, name_ref, category, start, end in zip(
+            _to_list(ids, "I"), _to_list(name_refs, "I"), categories.tolist(), starts, starts[1:]
+        )
+    ]
+
+def load_snapshot_file(path: str) -> Tuple[List[Contact], Dict]:
+    with open(path, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size == 0:
+            raise SnapshotError("Arquivo de snapshot vazio")
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return decode_snapshot(view)
+            finally:
+                view.release()
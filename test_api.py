@@ -150,6 +150,250 @@ def test_backup_functionality():
         print(f"Erro: {e}")
         return False
 
+def test_batch_get():
+    print("Testando busca em lote por IDs...")
+    try:
+        response = requests.post(f"{BASE_URL}/contacts/batch-get", json={"ids": [1, 2, 999]})
+        print_response(response, "Busca em Lote")
+        
+        if response.status_code == 200:
+            data = response.json()
+            return 999 in data.get("missing_ids", []) and len(data.get("contacts", [])) == 2
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_field_projection():
+    print("Testando seleção de campos...")
+    try:
+        response = requests.get(f"{BASE_URL}/contacts/?fields=id,name")
+        print_response(response, "Listar Apenas ID e Nome")
+        
+        if response.status_code == 200:
+            return all(set(c.keys()) == {"id", "name"} for c in response.json())
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_change_feed():
+    print("Testando feed de alterações...")
+    try:
+        response = requests.get(f"{BASE_URL}/contacts/changes?since=0&limit=5")
+        print_response(response, "Feed de Alterações")
+        
+        if response.status_code == 200:
+            data = response.json()
+            return len(data.get("changes", [])) <= 5 and "latest_sequence" in data
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_incremental_backup():
+    print("Testando backup incremental...")
+    try:
+        full = requests.get(f"{BASE_URL}/contacts/backup").json()
+        response = requests.get(f"{BASE_URL}/contacts/backup", params={"since_token": full["backup_token"]})
+        print_response(response, "Backup Incremental")
+        
+        invalid = requests.post(f"{BASE_URL}/contacts/restore", json={
+            "backup_type": "full",
+            "backup_token": "invalido",
+            "contacts": [{"id": -3, "name": "", "phones": [], "category": "pessoal"}]
+        })
+        print_response(invalid, "Restaurar Backup com Contato Inválido")
+        
+        if response.status_code == 200:
+            data = response.json()
+            return (data.get("backup_type") == "incremental" and data.get("base_token") == full["backup_token"]
+                    and invalid.status_code == 422)
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_combined_query():
+    print("Testando consulta combinada...")
+    try:
+        response = requests.get(f"{BASE_URL}/contacts/query?name=arantes&category=comercial&min_phones=2")
+        print_response(response, "Consulta Nome + Categoria + Telefones")
+        
+        if response.status_code == 200:
+            contacts = response.json().get("contacts", [])
+            return all(c["category"] == "comercial" and len(c["phones"]) >= 2 for c in contacts)
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_background_jobs():
+    print("Testando jobs em segundo plano...")
+    try:
+        response = requests.post(f"{BASE_URL}/contacts/jobs/statistics")
+        print_response(response, "Criar Job de Estatísticas")
+        if response.status_code != 202:
+            return False
+        
+        job_id = response.json()["id"]
+        for _ in range(20):
+            job = requests.get(f"{BASE_URL}/contacts/jobs/{job_id}").json()
+            if job["status"] in ("concluido", "falhou"):
+                break
+            time.sleep(0.25)
+        print(f"   Status final do job: {job['status']}")
+        
+        result = requests.get(f"{BASE_URL}/contacts/jobs/{job_id}/result")
+        print_response(result, "Resultado do Job")
+        
+        invalid = requests.post(f"{BASE_URL}/contacts/jobs/import", data="[1, 2]",
+                                headers={"Content-Type": "application/json"})
+        print_response(invalid, "Importação com Corpo Inválido")
+        return (result.status_code == 200 and "total_contatos" in result.json()
+                and invalid.status_code == 400)
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_search_cache():
+    print("Testando cache de buscas...")
+    try:
+        before = requests.get(f"{BASE_URL}/contacts/search/cache").json()
+        requests.get(f"{BASE_URL}/contacts/search?name=Bagnara")
+        requests.get(f"{BASE_URL}/contacts/search?name=bagnara")
+        response = requests.get(f"{BASE_URL}/contacts/search/cache")
+        print_response(response, "Estatísticas do Cache de Buscas")
+        
+        if response.status_code == 200:
+            return response.json()["hits"] > before["hits"]
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_duplicate_detection():
+    print("Testando detecção de duplicados...")
+    try:
+        planted = [
+            requests.post(f"{BASE_URL}/contacts/", json={
+                "name": name,
+                "phones": [{"number": number, "type": "celular"}],
+                "category": "pessoal"
+            }).json()["id"]
+            for name, number in (("Maria Oliveira", "11900000001"), ("Maria Oliveiraa", "11900000002"))
+        ]
+        
+        response = requests.get(f"{BASE_URL}/contacts/duplicates")
+        print_response(response, "Clusters de Possíveis Duplicados")
+        
+        for contact_id in planted:
+            requests.delete(f"{BASE_URL}/contacts/{contact_id}")
+        
+        if response.status_code == 200:
+            result = response.json()
+            clusters = result.get("clusters", [])
+            print(f"   Blocagem: {result.get('blocking')}")
+            planted_found = any(set(planted) <= set(c["contact_ids"]) for c in clusters)
+            return planted_found and all(len(c["contact_ids"]) > 1 for c in clusters)
+        return False
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_bulk_operations():
+    print("Testando atualização e remoção em lote...")
+    try:
+        created = [
+            requests.post(f"{BASE_URL}/contacts/", json={
+                "name": f"Lote Teste {suffix}",
+                "phones": [{"number": "11988887777", "type": "celular"}],
+                "category": "comercial"
+            }).json()["id"]
+            for suffix in ("Um", "Dois")
+        ]
+        
+        response = requests.patch(f"{BASE_URL}/contacts/bulk", json={
+            "filter": {"name": "Lote Teste", "category": "comercial"},
+            "update": {"category": "familiar"}
+        })
+        print_response(response, "Atualização em Lote")
+        updated_ok = response.status_code == 200 and response.json()["updated"] == len(created)
+        
+        response = requests.delete(f"{BASE_URL}/contacts/bulk", json={"ids": created + [999999]})
+        print_response(response, "Remoção em Lote com ID Inexistente (atômica)")
+        atomic_ok = response.status_code == 404
+        
+        response = requests.delete(f"{BASE_URL}/contacts/bulk", json={"ids": created})
+        print_response(response, "Remoção em Lote")
+        return updated_ok and atomic_ok and response.json()["deleted"] == len(created)
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_sorted_pagination():
+    print("Testando listagem ordenada por nome com paginação...")
+    try:
+        names = []
+        cursor = None
+        for page in range(1, 4):
+            params = {"sort": "name", "limit": 3, "fields": "name"}
+            if cursor:
+                params["after"] = requests.utils.unquote(cursor)
+            response = requests.get(f"{BASE_URL}/contacts/", params=params)
+            print_response(response, f"Página {page} (ordem alfabética)")
+            names.extend(c["name"].lower() for c in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        
+        response = requests.get(f"{BASE_URL}/contacts/", params={"sort": "-name", "category": "comercial", "limit": 3})
+        print_response(response, "Página em ordem decrescente filtrada por categoria")
+        category_names = [c["name"].lower() for c in response.json()]
+        category_ok = (all(c["category"] == "comercial" for c in response.json())
+                       and category_names == sorted(category_names, reverse=True))
+        return names == sorted(names) and category_ok
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
+def test_binary_snapshot():
+    print("Testando backup em formato binário...")
+    try:
+        response = requests.get(f"{BASE_URL}/contacts/backup?format=binary")
+        print(f"   Status: {response.status_code}")
+        print(f"   Content-Type: {response.headers.get('content-type')}")
+        print(f"   Tamanho: {len(response.content)} bytes")
+        
+        json_size = len(requests.get(f"{BASE_URL}/contacts/backup").content)
+        print(f"   Tamanho do backup JSON: {json_size} bytes")
+        
+        restored = requests.post(f"{BASE_URL}/contacts/restore/binary", data=response.content, headers={
+            "Content-Type": "application/vnd.contacts.snapshot",
+            "X-Backup-Token": response.headers.get("X-Backup-Token", "")
+        })
+        print_response(restored, "Restaurar Snapshot Binário")
+        
+        flipped = bytearray(response.content)
+        flipped[-1] ^= 0xFF
+        corrupt_files = {
+            "checksum alterado": bytes(flipped),
+            "arquivo truncado": response.content[:-7],
+            "lixo": b"0123456789"
+        }
+        rejected = 0
+        for label, content in corrupt_files.items():
+            corrupt = requests.post(f"{BASE_URL}/contacts/restore/binary", data=content,
+                                    headers={"Content-Type": "application/vnd.contacts.snapshot"})
+            print(f"   Snapshot corrompido ({label}): {corrupt.status_code} {corrupt.json().get('detail')}")
+            rejected += corrupt.status_code == 400
+        
+        return (response.status_code == 200 and response.content.startswith(b"CTSNAP")
+                and restored.status_code == 200 and rejected == len(corrupt_files))
+    except Exception as e:
+        print(f"Erro: {e}")
+        return False
+
 def test_error_handling():
     print("Testando tratamento de erros...")
     
@@ -207,6 +451,17 @@ def show_final_summary():
     print("   Busca por Nome")
     print("   Criação com Validação Brasileira")
     print("   Sistema de Backup")
+    print("   Busca em Lote")
+    print("   Seleção de Campos")
+    print("   Feed de Alterações")
+    print("   Backup Incremental")
+    print("   Consulta Combinada")
+    print("   Jobs em Segundo Plano")
+    print("   Cache de Buscas")
+    print("   Detecção de Duplicados")
+    print("   Operações em Lote")
+    print("   Paginação Ordenada")
+    print("   Snapshot Binário")
     print("   Tratamento de Erros")
     print("   Validações de Dados")
 def main():
@@ -242,6 +497,50 @@ def main():
         test_results.append(("Backup", test_backup_functionality()))
         time.sleep(0.5)
         
+        print_header("TESTE DE BUSCA EM LOTE")
+        test_results.append(("Busca em Lote", test_batch_get()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE SELEÇÃO DE CAMPOS")
+        test_results.append(("Seleção de Campos", test_field_projection()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE FEED DE ALTERAÇÕES")
+        test_results.append(("Feed de Alterações", test_change_feed()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE BACKUP INCREMENTAL")
+        test_results.append(("Backup Incremental", test_incremental_backup()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE CONSULTA COMBINADA")
+        test_results.append(("Consulta Combinada", test_combined_query()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE JOBS EM SEGUNDO PLANO")
+        test_results.append(("Jobs em Segundo Plano", test_background_jobs()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE CACHE DE BUSCAS")
+        test_results.append(("Cache de Buscas", test_search_cache()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE DETECÇÃO DE DUPLICADOS")
+        test_results.append(("Detecção de Duplicados", test_duplicate_detection()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE OPERAÇÕES EM LOTE")
+        test_results.append(("Operações em Lote", test_bulk_operations()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE PAGINAÇÃO ORDENADA")
+        test_results.append(("Paginação Ordenada", test_sorted_pagination()))
+        time.sleep(0.5)
+        
+        print_header("TESTE DE SNAPSHOT BINÁRIO")
+        test_results.append(("Snapshot Binário", test_binary_snapshot()))
+        time.sleep(0.5)
+        
         print_header("TESTE DE TRATAMENTO DE ERROS")
         test_error_handling()
         time.sleep(0.5)